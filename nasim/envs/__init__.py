@@ -1,2 +1,4 @@
 from .gym_env import NASimGymEnv
 from .environment import NASimEnv
+from .vec_env import VecNASimEnv
+from .subproc_env import SubprocNASimEnv
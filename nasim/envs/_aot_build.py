@@ -0,0 +1,49 @@
+"""Ahead-of-time compilation of the environment step kernels.
+
+Uses numba.pycc to compile the kernels in _kernels.py into the
+nasim.envs._aot_kernels extension module. When the extension module is
+available it is used in place of the JIT compiled kernels, so there is no
+compilation delay the first time the kernels are called in a new process.
+
+The extension is built by setup.py when numba is installed, or can be built
+in place by running:
+
+    python nasim/envs/_aot_build.py
+"""
+import os
+import importlib.util
+
+from numba.pycc import CC
+
+
+def _load_kernels():
+    """Load kernels module directly from file, so this module can be used
+    from setup.py before nasim and its dependencies are installed.
+    """
+    path = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                        "_kernels.py")
+    spec = importlib.util.spec_from_file_location("_kernels", path)
+    kernels = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(kernels)
+    return kernels
+
+
+_kernels = _load_kernels()
+
+cc = CC("_aot_kernels")
+cc.export(
+    "update_reachable",
+    "void(f4[:,:], i8, b1[:,:], i2[:], i8)"
+)(_kernels.update_reachable.py_func)
+cc.export(
+    "traffic_permitted",
+    "b1(f4[:,:], i8, i2[:], b1[:], b1[:,:,:], i8, i8)"
+)(_kernels.traffic_permitted.py_func)
+cc.export(
+    "traffic_permitted_bits",
+    "b1(f4[:,:], i8, i2[:], i8, i8[:,:], i8, i8)"
+)(_kernels.traffic_permitted_bits.py_func)
+
+
+if __name__ == "__main__":
+    cc.compile()
@@ -0,0 +1,129 @@
+"""Compiled kernels for the per-step hot path of the NASim environment.
+
+The kernels operate on plain numpy arrays (the state tensor and the dense
+network arrays precomputed by :class:`Network`) so they can be compiled with
+numba's ``@njit``. If numba is not installed (it is an optional dependency,
+see ``pip install nasim[numba]``) the kernels run as regular numpy code.
+"""
+import numpy as np
+
+try:
+    from numba import njit
+    # whether kernels are compiled (either JIT or AOT, see end of module)
+    COMPILED = True
+except ImportError:
+    COMPILED = False
+
+    def njit(*args, **kwargs):
+        """Fallback decorator that leaves function uncompiled """
+        if len(args) == 1 and callable(args[0]):
+            return args[0]
+        return lambda fn: fn
+
+
+@njit(cache=True)
+def update_reachable(tensor, reachable_idx, subnet_conn, host_subnet,
+                     comp_subnet):
+    """Set all hosts in subnets connected to comp_subnet as reachable.
+
+    Parameters
+    ----------
+    tensor : numpy.ndarray
+        the state tensor, updated in place
+    reachable_idx : int
+        column of reachable feature in state tensor
+    subnet_conn : numpy.ndarray
+        (#subnets, #subnets) boolean subnet connectivity matrix
+    host_subnet : numpy.ndarray
+        subnet of each host, indexed by host number
+    comp_subnet : int
+        subnet of newly compromised host
+    """
+    reachable = tensor[:, reachable_idx]
+    reachable[subnet_conn[comp_subnet][host_subnet]] = 1
+
+
+@njit(cache=True)
+def traffic_permitted(tensor, compromised_idx, host_subnet, subnet_public,
+                      firewall, dest_subnet, service):
+    """Check whether traffic for service is permitted to dest_subnet from any
+    subnet containing a compromised host or from any public subnet.
+
+    Parameters
+    ----------
+    tensor : numpy.ndarray
+        the state tensor
+    compromised_idx : int
+        column of compromised feature in state tensor
+    host_subnet : numpy.ndarray
+        subnet of each host, indexed by host number
+    subnet_public : numpy.ndarray
+        boolean mask of subnets connected to the internet (excluding the
+        internet subnet itself)
+    firewall : numpy.ndarray
+        (#subnets, #subnets, #services) boolean array of permitted traffic
+    dest_subnet : int
+        the destination subnet
+    service : int
+        the service number
+
+    Returns
+    -------
+    bool
+        True if traffic is permitted, otherwise False
+    """
+    sources = subnet_public.copy()
+    sources[host_subnet[tensor[:, compromised_idx] == 1]] = True
+    return (firewall[:, dest_subnet, service] & sources).any()
+
+
+@njit(cache=True)
+def traffic_permitted_bits(tensor, compromised_idx, host_subnet, public_bits,
+                           firewall_bits, dest_subnet, service):
+    """Check whether traffic for service is permitted to dest_subnet from any
+    subnet containing a compromised host or from any public subnet.
+
+    Same as :func:`traffic_permitted` except source subnets are represented
+    using int bitmaps (bit i set for subnet i), so only supports networks
+    with less than 64 subnets. This is only faster when the kernels are
+    compiled, since it loops over compromised hosts.
+
+    Parameters
+    ----------
+    tensor : numpy.ndarray
+        the state tensor
+    compromised_idx : int
+        column of compromised feature in state tensor
+    host_subnet : numpy.ndarray
+        subnet of each host, indexed by host number
+    public_bits : int
+        bitmap of subnets connected to the internet (excluding the internet
+        subnet itself)
+    firewall_bits : numpy.ndarray
+        (#subnets, #services) array, with bitmap of source subnets permitted
+        to send traffic for service to each destination subnet
+    dest_subnet : int
+        the destination subnet
+    service : int
+        the service number
+
+    Returns
+    -------
+    bool
+        True if traffic is permitted, otherwise False
+    """
+    sources = public_bits
+    for subnet in host_subnet[tensor[:, compromised_idx] == 1]:
+        sources |= np.int64(1) << subnet
+    return (firewall_bits[dest_subnet, service] & sources) != 0
+
+
+try:
+    # use ahead-of-time compiled kernels if they have been built
+    # (see _aot_build.py)
+    from ._aot_kernels import (    # noqa
+        update_reachable, traffic_permitted, traffic_permitted_bits
+    )
+    COMPILED = True
+except ImportError:
+    pass
@@ -30,6 +30,7 @@ There are two types of action spaces, depending on if you are using flat actions
 """
 
 import math
+from types import MappingProxyType
 import numpy as np
 from gym import spaces
 
@@ -50,6 +51,53 @@ def load_action_list(scenario):
     return action_list
 
 
+def load_action_arrays(action_list, scenario):
+    """Load the parameters of each action in list as numpy arrays
+
+    Parameters
+    ----------
+    action_list : list of Actions
+        the actions
+    scenario : Scenario
+        scenario description
+
+    Returns
+    -------
+    dict
+        map from parameter name to array containing parameter value for each
+        action, in same order as action list. Parameters are target_subnet,
+        target_host, target_idx (the target hosts number, i.e. row in state
+        tensor), cost, prob, service (service number, or -1 if action is not
+        an exploit), is_exploit and is_scan.
+    """
+    service_num_map = {srv: i for i, srv in enumerate(scenario.services)}
+    return {
+        "target_subnet": np.asarray(
+            [a.target[0] for a in action_list], dtype=np.int16
+        ),
+        "target_host": np.asarray(
+            [a.target[1] for a in action_list], dtype=np.int16
+        ),
+        "target_idx": np.asarray(
+            [scenario.host_num_map[a.target] for a in action_list],
+            dtype=np.intp
+        ),
+        "cost": np.asarray([a.cost for a in action_list], dtype=np.float32),
+        "prob": np.asarray([a.prob for a in action_list], dtype=np.float32),
+        "service": np.asarray(
+            [service_num_map[a.service] if a.is_exploit() else -1
+             for a in action_list],
+            dtype=np.int16
+        ),
+        "is_exploit": np.asarray(
+            [a.is_exploit() for a in action_list], dtype=np.bool_
+        ),
+        "is_scan": np.asarray(
+            [a.is_scan() for a in action_list], dtype=np.bool_
+        )
+    }
+
+
 class Action:
     """The base abstract action class in the environment
 
@@ -394,6 +442,39 @@ class ActionResult:
         return "\n".join(output)
 
 
+class _FailedActionResult(ActionResult):
+    """Result of a failed action, shared between failed actions to avoid
+    creating a new result (and its dicts) every time an action fails.
+
+    Its dicts are read-only, and :func:`info` returns new empty dicts, so
+    the shared result can't be modified via its info.
+    """
+
+    def __init__(self, connection_error=False):
+        super().__init__(False, 0.0, connection_error=connection_error)
+        self.services = MappingProxyType({})
+        self.os = MappingProxyType({})
+        self.discovered = MappingProxyType({})
+
+    def info(self):
+        return dict(
+            success=False,
+            value=0.0,
+            services={},
+            os={},
+            discovered={},
+            connection_error=self.connection_error
+        )
+
+    def __reduce__(self):
+        # mapping proxies can't be pickled, so recreate on load
+        return (type(self), (self.connection_error, ))
+
+
+FAILED_RESULT = _FailedActionResult()
+CONNECTION_ERROR_RESULT = _FailedActionResult(connection_error=True)
+
+
 class FlatActionSpace(spaces.Discrete):
     """Flat Action space for NASim environment.
 
@@ -407,6 +488,23 @@ class FlatActionSpace(spaces.Discrete):
         the number of actions in the action space
     actions : list of Actions
         the list of the Actions in the action space
+    target_subnet : numpy.ndarray
+        the target subnet of each action
+    target_host : numpy.ndarray
+        the target host (within subnet) of each action
+    target_idx : numpy.ndarray
+        the host number (row in state tensor) of target of each action
+    cost : numpy.ndarray
+        the cost of each action
+    prob : numpy.ndarray
+        the success probability of each action
+    service : numpy.ndarray
+        the number of service targeted by each action, or -1 if the action
+        is not an exploit
+    is_exploit : numpy.ndarray
+        whether each action is an exploit
+    is_scan : numpy.ndarray
+        whether each action is a scan
     """
 
     def __init__(self, scenario):
@@ -417,6 +515,15 @@ class FlatActionSpace(spaces.Discrete):
             scenario description
         """
         self.actions = load_action_list(scenario)
+        arrays = load_action_arrays(self.actions, scenario)
+        self.target_subnet = arrays["target_subnet"]
+        self.target_host = arrays["target_host"]
+        self.target_idx = arrays["target_idx"]
+        self.cost = arrays["cost"]
+        self.prob = arrays["prob"]
+        self.service = arrays["service"]
+        self.is_exploit = arrays["is_exploit"]
+        self.is_scan = arrays["is_scan"]
         super().__init__(len(self.actions))
 
     def get_action(self, action_idx):
@@ -424,7 +531,7 @@ class FlatActionSpace(spaces.Discrete):
 
         Parameters
         ----------
-        action_idx : int
+        action_idx : int or numpy.integer
             the action idx
 
         Returns
@@ -432,9 +539,10 @@ class FlatActionSpace(spaces.Discrete):
         Action
             Corresponding Action object
         """
-        assert isinstance(action_idx, int), \
-            ("When using flat action space, action must be an integer"
-             f" or an Action object: {action_idx} is invalid")
+        if type(action_idx) is not int:
+            assert isinstance(action_idx, np.integer), \
+                ("When using flat action space, action must be an integer"
+                 f" or an Action object: {action_idx} is invalid")
         return self.actions[action_idx]
 
 
@@ -0,0 +1,382 @@
+""" A GPU version of the vectorized NASim environment: CudaNASimEnv.
+
+The CudaNASimEnv class runs a batch of environments for the same scenario
+on a CUDA GPU using numba, with one GPU thread simulating each environment.
+The scenario (firewall, topology, actions) is copied to the GPU once and the
+state of every environment is kept on the GPU, so stepping the batch
+requires no host/device transfers other than the actions (unless these are
+already on the GPU).
+
+Requires numba (``pip install nasim[numba]``) and a CUDA capable GPU. This
+module is not imported by default, use:
+
+    from nasim.envs.cuda_env import CudaNASimEnv
+"""
+import numpy as np
+from gym import error, spaces
+
+try:
+    from numba import cuda
+    from numba.cuda.random import (
+        create_xoroshiro128p_states, xoroshiro128p_uniform_float32
+    )
+except ImportError as e:
+    raise error.DependencyNotInstalled(
+        f"{e}. (HINT: you can install numba by running "
+        "'pip install nasim[numba]'.)"
+    )
+
+from .state import State
+from .network import Network
+from .host_vector import HostVector
+from .observation import Observation
+from .action import FlatActionSpace
+
+# action types
+_EXPLOIT = 0
+_SERVICE_SCAN = 1
+_OS_SCAN = 2
+_SUBNET_SCAN = 3
+
+# positions of host vector columns in columns array passed to kernels
+_COMPROMISED = 0
+_REACHABLE = 1
+_DISCOVERED = 2
+_VALUE = 3
+_DISCOVERY_VALUE = 4
+
+
+@cuda.jit(device=True)
+def _traffic_permitted(state, comp_col, host_subnet, subnet_public, firewall,
+                       dest_subnet, service):
+    for src in range(subnet_public.shape[0]):
+        if not firewall[src, dest_subnet, service]:
+            continue
+        if subnet_public[src]:
+            return True
+        for h in range(state.shape[0]):
+            if host_subnet[h] == src and state[h, comp_col] == 1:
+                return True
+    return False
+
+
+@cuda.jit
+def _step_kernel(actions, tensors, steps, rewards, dones, success, conn_error,
+                 rng_states, a_type, a_target, a_subnet, a_service, a_srv_col,
+                 a_os_col, a_cost, a_prob, host_subnet, subnet_public,
+                 subnet_conn, firewall, sensitive_idx, cols, step_limit):
+    env = cuda.grid(1)
+    if env >= actions.shape[0]:
+        return
+
+    comp_col = cols[_COMPROMISED]
+    reach_col = cols[_REACHABLE]
+    disc_col = cols[_DISCOVERED]
+    state = tensors[env]
+    a = actions[env]
+    t = a_target[a]
+    subnet = a_subnet[a]
+    reward = -a_cost[a]
+    succeeded = False
+    connection_error = False
+
+    if state[t, reach_col] != 1 or state[t, disc_col] != 1:
+        connection_error = True
+    elif a_type[a] == _EXPLOIT and not _traffic_permitted(
+            state, comp_col, host_subnet, subnet_public, firewall,
+            subnet, a_service[a]):
+        connection_error = True
+    elif (a_type[a] != _EXPLOIT or state[t, comp_col] != 1) and \
+            xoroshiro128p_uniform_float32(rng_states, env) > a_prob[a]:
+        # random failure, exploits of compromised hosts never fail randomly
+        pass
+    elif a_type[a] == _SUBNET_SCAN:
+        if state[t, comp_col] != 1:
+            connection_error = True
+        else:
+            succeeded = True
+            for h in range(state.shape[0]):
+                if subnet_conn[subnet, host_subnet[h]] and \
+                   state[h, disc_col] != 1:
+                    state[h, disc_col] = 1
+                    reward += state[h, cols[_DISCOVERY_VALUE]]
+    elif a_type[a] != _EXPLOIT:
+        # service and os scans don't change state
+        succeeded = True
+    elif state[t, a_srv_col[a]] == 1 and \
+            (a_os_col[a] < 0 or state[t, a_os_col[a]] == 1):
+        succeeded = True
+        if state[t, comp_col] != 1:
+            reward += state[t, cols[_VALUE]]
+            state[t, comp_col] = 1
+        for h in range(state.shape[0]):
+            if subnet_conn[subnet, host_subnet[h]]:
+                state[h, reach_col] = 1
+
+    goal_reached = True
+    for i in range(sensitive_idx.shape[0]):
+        if state[sensitive_idx[i], comp_col] != 1:
+            goal_reached = False
+    steps[env] += 1
+
+    rewards[env] = reward
+    dones[env] = goal_reached or (0 < step_limit <= steps[env])
+    success[env] = succeeded
+    conn_error[env] = connection_error
+
+
+@cuda.jit
+def _reset_kernel(tensors, steps, mask, initial_tensor):
+    env = cuda.grid(1)
+    if env >= tensors.shape[0] or not mask[env]:
+        return
+    for h in range(initial_tensor.shape[0]):
+        for f in range(initial_tensor.shape[1]):
+            tensors[env, h, f] = initial_tensor[h, f]
+    steps[env] = 0
+
+
+@cuda.jit
+def _observe_kernel(tensors, dones, success, conn_error, obs, success_idx,
+                    conn_error_idx):
+    env = cuda.grid(1)
+    if env >= tensors.shape[0]:
+        return
+    for h in range(tensors.shape[1]):
+        for f in range(tensors.shape[2]):
+            obs[env, h, f] = tensors[env, h, f]
+    aux_row = tensors.shape[1]
+    for f in range(obs.shape[2]):
+        obs[env, aux_row, f] = 0
+    if not dones[env]:
+        obs[env, aux_row, success_idx] = success[env]
+        obs[env, aux_row, conn_error_idx] = conn_error[env]
+
+
+class CudaNASimEnv:
+    """A batch of simulated computer network environments for pen-testing,
+    run on a CUDA GPU.
+
+    All environments in the batch use the same scenario and a flat action
+    space, so each action is represented by an integer. Environments are
+    always fully observable.
+
+    Environments are reset automatically when they reach the goal or the
+    scenario step limit, in which case the observation returned for that
+    environment is the first observation of the next episode.
+
+    Observations, rewards, dones and info arrays are returned as numba
+    device arrays (which support the CUDA array interface, so can be used
+    directly by other GPU libraries). These buffers are reused between steps,
+    so copy them if they need to be kept.
+
+    ...
+
+    Attributes
+    ----------
+    name : str
+        the environment scenario name
+    scenario : Scenario
+        Scenario object, defining the properties of the environments
+    num_envs : int
+        the number of environments in the batch
+    action_space : FlatActionSpace
+        Action space for a single environment
+    observation_space : gym.spaces.Box
+        observation space for a single environment.
+        If *flat_obs=True* then observations are represented by a 1D vector,
+        otherwise observations are represented as a 2D matrix.
+    """
+
+    def __init__(self,
+                 scenario,
+                 num_envs,
+                 flat_obs=True,
+                 seed=None,
+                 threads_per_block=64):
+        """
+        Parameters
+        ----------
+        scenario : Scenario
+            Scenario object, defining the properties of the environments
+        num_envs : int
+            the number of environments in the batch
+        flat_obs : bool, optional
+            If true then uses a 1D observation space, otherwise uses a 2D
+            observation space (default=True)
+        seed : int, optional
+            seed for GPU random number generator, if None a seed is drawn
+            from numpy's global random state (default=None)
+        threads_per_block : int, optional
+            number of CUDA threads (i.e. environments) per block
+            (default=64)
+        """
+        self.name = scenario.name
+        self.scenario = scenario
+        self.num_envs = num_envs
+        self.flat_obs = flat_obs
+        self._threads = threads_per_block
+        self._blocks = (num_envs + threads_per_block - 1) // threads_per_block
+
+        network = Network(scenario)
+        self.action_space = FlatActionSpace(scenario)
+        initial_state = State.generate_initial_state(network)
+        num_hosts, host_size = initial_state.shape()
+        self._obs_shape = (num_hosts + 1, host_size)
+
+        if self.flat_obs:
+            obs_shape = (int(np.prod(self._obs_shape)), )
+        else:
+            obs_shape = self._obs_shape
+        obs_low, obs_high = Observation.get_space_bounds(self.scenario)
+        self.observation_space = spaces.Box(
+            low=obs_low, high=obs_high, shape=obs_shape
+        )
+
+        # static scenario arrays, copied to device once
+        actions = self.action_space.actions
+        a_type = np.empty(len(actions), dtype=np.int32)
+        a_srv_col = np.full(len(actions), -1, dtype=np.int32)
+        a_os_col = np.full(len(actions), -1, dtype=np.int32)
+        for a_idx, action in enumerate(actions):
+            if action.is_exploit():
+                a_type[a_idx] = _EXPLOIT
+                srv_num = HostVector.service_idx_map[action.service]
+                a_srv_col[a_idx] = HostVector._get_service_idx(srv_num)
+                if action.os is not None:
+                    os_num = HostVector.os_idx_map[action.os]
+                    a_os_col[a_idx] = HostVector._get_os_idx(os_num)
+            elif action.is_service_scan():
+                a_type[a_idx] = _SERVICE_SCAN
+            elif action.is_os_scan():
+                a_type[a_idx] = _OS_SCAN
+            else:
+                a_type[a_idx] = _SUBNET_SCAN
+        cols = np.asarray([HostVector._compromised_idx,
+                           HostVector._reachable_idx,
+                           HostVector._discovered_idx,
+                           HostVector._value_idx,
+                           HostVector._discovery_value_idx],
+                          dtype=np.int32)
+
+        self._static_args = (
+            cuda.to_device(a_type),
+            cuda.to_device(self.action_space.target_idx.astype(np.int32)),
+            cuda.to_device(self.action_space.target_subnet.astype(np.int32)),
+            cuda.to_device(self.action_space.service.astype(np.int32)),
+            cuda.to_device(a_srv_col),
+            cuda.to_device(a_os_col),
+            cuda.to_device(self.action_space.cost),
+            cuda.to_device(self.action_space.prob),
+            cuda.to_device(network._host_subnet.astype(np.int32)),
+            cuda.to_device(network._subnet_public),
+            cuda.to_device(network._subnet_conn),
+            cuda.to_device(network._firewall),
+            cuda.to_device(network._sensitive_idx.astype(np.int32)),
+            cuda.to_device(cols),
+            np.int32(scenario.step_limit or 0)
+        )
+        self._initial_tensor = cuda.to_device(initial_state.tensor)
+
+        # per environment state, kept on device
+        self._tensors = cuda.device_array(
+            (num_envs, num_hosts, host_size), dtype=np.float32
+        )
+        self._steps = cuda.device_array(num_envs, dtype=np.int32)
+        self._obs = cuda.device_array(
+            (num_envs, ) + self._obs_shape, dtype=np.float32
+        )
+        self._rewards = cuda.device_array(num_envs, dtype=np.float32)
+        self._dones = cuda.device_array(num_envs, dtype=np.bool_)
+        self._success = cuda.device_array(num_envs, dtype=np.bool_)
+        self._conn_error = cuda.device_array(num_envs, dtype=np.bool_)
+        self._all_envs = cuda.to_device(np.ones(num_envs, dtype=np.bool_))
+
+        if seed is None:
+            seed = np.random.randint(np.iinfo(np.int32).max)
+        self._rng_states = create_xoroshiro128p_states(num_envs, seed=seed)
+
+    def reset(self):
+        """Reset the state of every environment in batch.
+
+        Returns
+        -------
+        DeviceNDArray
+            the initial observation of each environment, stacked along the
+            first axis
+        """
+        launch = (self._blocks, self._threads)
+        _reset_kernel[launch](
+            self._tensors, self._steps, self._all_envs, self._initial_tensor
+        )
+        _observe_kernel[launch](self._tensors,
+                                self._all_envs,
+                                self._success,
+                                self._conn_error,
+                                self._obs,
+                                Observation._success_idx,
+                                Observation._conn_error_idx)
+        return self._format_obs(self._obs)
+
+    def step_batch(self, actions):
+        """Run one step of every environment in batch.
+
+        Parameters
+        ----------
+        actions : list or numpy.Array or DeviceNDArray
+            the integer action to perform in each environment
+
+        Returns
+        -------
+        DeviceNDArray
+            observation of each environment, stacked along first axis
+        DeviceNDArray
+            reward from performing action in each environment
+        DeviceNDArray
+            whether the episode has ended for each environment
+        dict
+            auxiliary information regarding step, containing device arrays
+            for "success" and "connection_error" of each environments action
+        """
+        if not hasattr(actions, "__cuda_array_interface__"):
+            actions = cuda.to_device(np.asarray(actions, dtype=np.int32))
+        assert actions.shape == (self.num_envs, ), \
+            f"Must provide one action per env: {actions.shape} is invalid"
+
+        launch = (self._blocks, self._threads)
+        _step_kernel[launch](actions,
+                             self._tensors,
+                             self._steps,
+                             self._rewards,
+                             self._dones,
+                             self._success,
+                             self._conn_error,
+                             self._rng_states,
+                             *self._static_args)
+        _reset_kernel[launch](
+            self._tensors, self._steps, self._dones, self._initial_tensor
+        )
+        _observe_kernel[launch](self._tensors,
+                                self._dones,
+                                self._success,
+                                self._conn_error,
+                                self._obs,
+                                Observation._success_idx,
+                                Observation._conn_error_idx)
+        info = {"success": self._success,
+                "connection_error": self._conn_error}
+        return self._format_obs(self._obs), self._rewards, self._dones, info
+
+    def _format_obs(self, obs):
+        if self.flat_obs:
+            return obs.reshape(self.num_envs, -1)
+        return obs
+
+    def __str__(self):
+        output = [
+            "CudaNASimEnv:",
+            f"name={self.name}",
+            f"num_envs={self.num_envs}",
+            f"flat_obs={self.flat_obs}"
+        ]
+        return "\n  ".join(output)
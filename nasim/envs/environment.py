@@ -101,6 +101,13 @@ class NASimEnv(gym.Env):
 
         self.steps = 0
 
+    @property
+    def renderer(self):
+        """The Viewer used for rendering, created on first use """
+        if self._renderer is None:
+            self._renderer = Viewer(self.network)
+        return self._renderer
+
     def reset(self):
         """Reset the state of the environment and returns the initial state.
 
@@ -253,12 +260,8 @@ class NASimEnv(gym.Env):
         if not isinstance(obs, Observation):
             obs = Observation.from_numpy(obs, self.current_state.shape())
 
-        if self._renderer is None:
-            self._renderer = Viewer(self.network)
-
         if mode == "readable":
-
-            self._renderer.render_readable(obs)
+            self.renderer.render_readable(obs)
         else:
             print(
                 "Please choose correct render mode from :"
@@ -291,11 +294,8 @@ class NASimEnv(gym.Env):
                                      self.current_state.shape(),
                                      self.current_state.host_num_map)
 
-        if self._renderer is None:
-            self._renderer = Viewer(self.network)
-
         if mode == "readable":
-            self._renderer.render_readable_state(state)
+            self.renderer.render_readable_state(state)
         else:
             print("Please choose correct render mode from :"
                   f"{self.rendering_modes}")
@@ -308,11 +308,11 @@ class NASimEnv(gym.Env):
 
         Parameters
         ----------
-        action : int or Action
+        action : int or list or NumpyArray or Action
             the action to render
         """
-        if isinstance(action, int):
-            action = self.action_space[action]
+        if not isinstance(action, Action):
+            action = self.action_space.get_action(action)
         print(action)
 
     def render_episode(self, episode, width=7, height=7):
@@ -329,9 +329,7 @@ class NASimEnv(gym.Env):
         height : int
             height of GUI window
         """
-        if self._renderer is None:
-            self._renderer = Viewer(self.network)
-        self._renderer.render_episode(episode)
+        self.renderer.render_episode(episode)
 
     def render_network_graph(self, ax=None, show=False):
         """Render a plot of network as a graph with hosts as nodes arranged
@@ -346,10 +344,8 @@ class NASimEnv(gym.Env):
             whether to display plot, or simply setup plot and showing plot
             can be handled elsewhere by user
         """
-        if self._renderer is None:
-            self._renderer = Viewer(self.network)
         state = self.current_state
-        self._renderer.render_graph(state, ax, show)
+        self.renderer.render_graph(state, ax, show)
 
     def get_minimum_actions(self):
         """Get the minimum number of actions required to reach the goal.
@@ -376,12 +372,8 @@ class NASimEnv(gym.Env):
         """
         assert isinstance(self.action_space, FlatActionSpace), \
             "Can only use action mask function when using flat action space"
-        mask = np.zeros(self.action_space.n, dtype=np.int64)
-        for a in range(self.action_space.n):
-            action = self.action_space.get_action(a)
-            if self.network.host_discovered(action.target):
-                mask[a] = 1
-        return mask
+        discovered = self.current_state.discovered_mask()
+        return discovered[self.action_space.target_idx].astype(np.int64)
 
     def get_score_upper_bound(self):
         """Get the theoretical upper bound for total reward for scenario.
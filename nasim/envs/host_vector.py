@@ -6,7 +6,7 @@ in the NASim environment.
 
 import numpy as np
 
-from .action import ActionResult
+from .action import ActionResult, FAILED_RESULT
 
 
 class HostVector:
@@ -205,7 +205,7 @@ class HostVector:
                                             services=self.services,
                                             os=self.os)
         # service absent, exploit fails
-        return next_state, ActionResult(False, 0)
+        return next_state, FAILED_RESULT
 
     def observe(self,
                 address=False,
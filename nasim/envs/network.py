@@ -1,12 +1,38 @@
 import numpy as np
 
-from .action import ActionResult
+from .action import ActionResult, FAILED_RESULT, CONNECTION_ERROR_RESULT
+from .host_vector import HostVector
+from ._kernels import (
+    COMPILED, update_reachable, traffic_permitted, traffic_permitted_bits
+)
 from .utils import get_minimal_steps_to_goal, min_subnet_depth
 
 # column in topology adjacency matrix that represents connection between
 # subnet and public
 INTERNET = 0
 
+# number of uniform random numbers pre-drawn at a time for action success.
+# Kept small since the buffer is discarded on every reset.
+RAND_BUFFER_SIZE = 32
+
+
+def _make_goal_check(sensitive_idx):
+    """Generate goal check function for a network, with the state tensor
+    rows of the sensitive hosts inlined as constants.
+
+    The generated function takes a state tensor and the index of the
+    compromised column, and returns True if all sensitive hosts are
+    compromised.
+    """
+    checks = [f"tensor[{int(i)}, c] == 1" for i in sensitive_idx]
+    src = (
+        "def goal_check(tensor, c):\n"
+        f"    return bool({' and '.join(checks) or 'True'})\n"
+    )
+    namespace = {}
+    exec(compile(src, "<nasim goal_check>", "exec"), namespace)
+    return namespace["goal_check"]
+
 
 class Network:
 
@@ -20,8 +46,75 @@ class Network:
         self.address_space_bounds = scenario.address_space_bounds
         self.sensitive_addresses = scenario.sensitive_addresses
         self.sensitive_hosts = scenario.sensitive_hosts
+        self.services = scenario.services
+
+        # dense versions of topology and host addresses, used for vectorized
+        # updates of host state (host indices match rows of state tensor)
+        assert len(self.subnets) <= np.iinfo(np.int16).max
+        self._subnet_conn = np.asarray(self.topology) == 1
+        self._host_subnet = np.zeros(len(self.host_num_map), dtype=np.int16)
+        for host_addr, host_num in self.host_num_map.items():
+            self._host_subnet[host_num] = host_addr[0]
+        # internet subnet contains no hosts so is never a source of traffic
+        self._subnet_public = self._subnet_conn[:, INTERNET].copy()
+        self._subnet_public[INTERNET] = False
+        self._sensitive_idx = np.asarray(
+            [self.host_num_map[addr] for addr in self.sensitive_addresses],
+            dtype=np.intp
+        )
+        self._goal_check = _make_goal_check(self._sensitive_idx)
+
+        # dense firewall, _firewall[src, dest, srv] is True if traffic for
+        # service is permitted from src subnet to dest subnet
+        self._service_num_map = {}
+        for srv_num, srv in enumerate(self.services):
+            self._service_num_map[srv] = srv_num
+        num_subnets = len(self.subnets)
+        self._firewall = np.zeros(
+            (num_subnets, num_subnets, len(self.services)), dtype=np.bool_
+        )
+        for src in range(num_subnets):
+            for dest in range(num_subnets):
+                for srv, srv_num in self._service_num_map.items():
+                    self._firewall[src, dest, srv_num] = \
+                        self.subnet_traffic_permitted(src, dest, srv)
+
+        # for networks with less than 64 subnets, source subnets of traffic
+        # are checked using int bitmaps (bit i set for subnet i). Only used
+        # with compiled kernels, since otherwise it is slower than a mask.
+        self._use_subnet_bits = COMPILED and num_subnets < 64
+        if self._use_subnet_bits:
+            self._public_bits = 0
+            for subnet in np.flatnonzero(self._subnet_public):
+                self._public_bits |= 1 << int(subnet)
+            # _firewall_bits[dest, srv] is bitmap of permitted src subnets
+            self._firewall_bits = np.zeros(
+                (num_subnets, len(self.services)), dtype=np.int64
+            )
+            for src in range(num_subnets):
+                self._firewall_bits |= \
+                    self._firewall[src].astype(np.int64) << src
+
+        self._rand_buf = []
+        self._rand_idx = 0
+
+        # computed on first use, network topology never changes
+        self._minimal_steps = None
+
+    def __getstate__(self):
+        # generated functions can't be pickled, so are rebuilt on load
+        state = self.__dict__.copy()
+        del state["_goal_check"]
+        return state
+
+    def __setstate__(self, state):
+        self.__dict__.update(state)
+        self._goal_check = _make_goal_check(self._sensitive_idx)
 
     def reset(self, state):
+        # discard any pre-drawn random numbers, so episodes are reproducible
+        # using np.random.seed
+        self._rand_idx = len(self._rand_buf)
         next_state = state.copy()
         for host_addr in self.address_space:
             host = next_state.get_host(host_addr)
@@ -57,40 +150,57 @@ class Network:
             # do nothing
             return next_state, ActionResult(True)
 
-        if not state.host_reachable(action.target):
-            # print("target not reachable")
-            return next_state, ActionResult(False,
-                                            0.0,
-                                            connection_error=True)
-
-        if not state.host_discovered(action.target):
-            # print("target not discovered")
-            return next_state, ActionResult(False,
-                                            0.0,
-                                            connection_error=True)
-
-        if action.is_exploit() and not \
-           self.host_service_traffic_permitted(state,
-                                               action.target,
-                                               action.service):
+        t_host = state.get_host(action.target)
+        if not (t_host.reachable and t_host.discovered):
+            # print("target not reachable or not discovered")
+            return next_state, CONNECTION_ERROR_RESULT
+
+        if action.is_scan():
+            # scans don't depend on firewall
+            if self._random() > action.prob:
+                # print("random failure")
+                return next_state, FAILED_RESULT
+            return self._execute_action(next_state, action)
+
+        if not self.host_service_traffic_permitted(state,
+                                                   action.target,
+                                                   action.service):
             # print("traffic not permitted")
-            return next_state, ActionResult(False,
-                                            0.0,
-                                            connection_error=True)
-
-        if action.is_exploit() and \
-           state.host_compromised(action.target):
-            # host already compromised so exploits don't fail due to randomness
-            pass
-        elif np.random.rand() > action.prob:
+            return next_state, CONNECTION_ERROR_RESULT
+
+        # exploits against already compromised hosts don't fail due to
+        # randomness
+        if not t_host.compromised and self._random() > action.prob:
             # print("random failure")
-            return next_state, ActionResult(False, 0.0)
+            return next_state, FAILED_RESULT
 
+        return self._execute_action(next_state, action)
+
+    def _random(self):
+        """Get next uniform random number in [0, 1), drawing numbers from
+        numpy's global random state in bulk to reduce per step overhead.
+
+        Note, this means the global random state is advanced RAND_BUFFER_SIZE
+        numbers at a time, rather than once per action.
+        """
+        if self._rand_idx == len(self._rand_buf):
+            self._rand_buf = np.random.random_sample(RAND_BUFFER_SIZE).tolist()
+            self._rand_idx = 0
+        u = self._rand_buf[self._rand_idx]
+        self._rand_idx += 1
+        return u
+
+    def _execute_action(self, next_state, action):
+        """Execute action in given state, assuming the action's connection
+        and random success checks have already passed.
+
+        Note, next_state is updated in place.
+        """
         if action.is_subnet_scan():
             # print("subnet scan")
             return self._perform_subnet_scan(next_state, action)
 
-        t_host = state.get_host(action.target)
+        t_host = next_state.get_host(action.target)
         next_host_state, action_obs = t_host.perform_action(action)
         next_state.update_host(action.target, next_host_state)
         self._update(next_state, action, action_obs)
@@ -98,9 +208,7 @@ class Network:
 
     def _perform_subnet_scan(self, next_state, action):
         if not next_state.host_compromised(action.target):
-            return next_state, ActionResult(False,
-                                            0.0,
-                                            connection_error=True)
+            return next_state, CONNECTION_ERROR_RESULT
 
         discovered = {}
         discovery_reward = 0
@@ -125,12 +233,11 @@ class Network:
         """Updates the reachable status of hosts on network, based on current
         state and newly exploited host
         """
-        comp_subnet = compromised_addr[0]
-        for addr in self.address_space:
-            if state.host_reachable(addr):
-                continue
-            if self.subnets_connected(comp_subnet, addr[0]):
-                state.set_host_reachable(addr)
+        update_reachable(state.tensor,
+                         HostVector._reachable_idx,
+                         self._subnet_conn,
+                         self._host_subnet,
+                         compromised_addr[0])
 
     def get_sensitive_hosts(self):
         return self.sensitive_addresses
@@ -153,15 +260,21 @@ class Network:
         """Checks whether the firewall permits traffic to a given host and service,
         based on current set of compromised hosts on network.
         """
-        for src_addr in self.address_space:
-            if not state.host_compromised(src_addr) and \
-               not self.subnet_public(src_addr[0]):
-                continue
-            if self.subnet_traffic_permitted(src_addr[0],
-                                             host_addr[0],
-                                             service):
-                return True
-        return False
+        if self._use_subnet_bits:
+            return traffic_permitted_bits(state.tensor,
+                                          HostVector._compromised_idx,
+                                          self._host_subnet,
+                                          self._public_bits,
+                                          self._firewall_bits,
+                                          host_addr[0],
+                                          self._service_num_map[service])
+        return traffic_permitted(state.tensor,
+                                 HostVector._compromised_idx,
+                                 self._host_subnet,
+                                 self._subnet_public,
+                                 self._firewall,
+                                 host_addr[0],
+                                 self._service_num_map[service])
 
     def subnet_public(self, subnet):
         return self.topology[subnet][INTERNET] == 1
@@ -170,10 +283,7 @@ class Network:
         return len(self.subnets)
 
     def all_sensitive_hosts_compromised(self, state):
-        for host_addr in self.sensitive_addresses:
-            if not state.host_compromised(host_addr):
-                return False
-        return True
+        return self._goal_check(state.tensor, HostVector._compromised_idx)
 
     def get_total_sensitive_host_value(self):
         total = 0
@@ -182,8 +292,11 @@ class Network:
         return total
 
     def get_minimal_steps(self):
-        return get_minimal_steps_to_goal(self.topology,
-                                         self.sensitive_addresses)
+        if self._minimal_steps is None:
+            self._minimal_steps = get_minimal_steps_to_goal(
+                self.topology, self.sensitive_addresses
+            )
+        return self._minimal_steps
 
     def get_subnet_depths(self):
         return min_subnet_depth(self.topology)
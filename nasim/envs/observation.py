@@ -66,6 +66,7 @@ class Observation:
     @classmethod
     def from_numpy(cls, o_array, state_shape):
         obs = cls(state_shape)
+        o_array = np.ascontiguousarray(o_array, dtype=np.float32)
         if o_array.shape != (state_shape[0]+1, state_shape[1]):
             o_array = o_array.reshape(state_shape[0]+1, state_shape[1])
         obs.tensor = o_array
@@ -149,6 +150,18 @@ class Observation:
         """
         return self.tensor
 
+    def __array__(self, dtype=None, copy=None):
+        """Support np.asarray(obs), which returns the observation tensor
+        itself (i.e. not a copy) unless a different dtype is requested.
+        """
+        if dtype is None or dtype == self.tensor.dtype:
+            return self.tensor.copy() if copy else self.tensor
+        if copy is False:
+            raise ValueError(
+                f"Unable to avoid copy when converting Observation to {dtype}"
+            )
+        return self.tensor.astype(dtype)
+
     def get_readable(self):
         host_obs = []
         for host_idx in range(self.obs_shape[0]-1):
@@ -20,6 +20,12 @@ class State:
     host_num_map : dict
         mapping from host address to host number (this is used
         to map host address to host row in the network tensor)
+
+    Notes
+    -----
+    A State can be passed directly to numpy functions, with np.asarray(state)
+    returning the state tensor without copying it (so e.g. stacking states
+    into a batch only copies each tensor once).
     """
 
     def __init__(self, network_tensor, host_num_map):
@@ -27,12 +33,15 @@ class State:
         Parameters
         ----------
         state_tensor : np.Array
-            the tensor representation of the network state
+            the tensor representation of the network state. The state
+            kernels require a C-contiguous float32 tensor, so it is copied
+            to one if it is not one already.
         host_num_map : dict
             mapping from host address to host number (this is used
             to map host address to host row in the network tensor)
         """
-        self.tensor = network_tensor
+        # no-op (i.e. no copy) if tensor is already C-contiguous float32
+        self.tensor = np.ascontiguousarray(network_tensor, dtype=np.float32)
         self.host_num_map = host_num_map
 
     @classmethod
@@ -195,6 +204,19 @@ class State:
     def numpy(self):
         return self.tensor
 
+    def __array__(self, dtype=None, copy=None):
+        """Support np.asarray(state), which returns the state tensor itself
+        (i.e. not a copy) unless a different dtype is requested. Use
+        :func:`copy` to get a snapshot of the state.
+        """
+        if dtype is None or dtype == self.tensor.dtype:
+            return self.tensor.copy() if copy else self.tensor
+        if copy is False:
+            raise ValueError(
+                f"Unable to avoid copy when converting State to {dtype}"
+            )
+        return self.tensor.astype(dtype)
+
     def update_host(self, host_addr, host_vector):
         host_idx = self.host_num_map[host_addr]
         self.tensor[host_idx] = host_vector.vector
@@ -219,6 +241,10 @@ class State:
     def host_discovered(self, host_addr):
         return self.get_host(host_addr).discovered
 
+    def discovered_mask(self):
+        """Get boolean mask of discovered hosts, indexed by host number """
+        return self.tensor[:, HostVector._discovered_idx] == 1
+
     def set_host_compromised(self, host_addr):
         self.get_host(host_addr).compromised = True
 
@@ -0,0 +1,311 @@
+""" Runs NASimEnv environments in parallel worker processes:
+SubprocNASimEnv.
+
+Each worker process owns a single NASimEnv. Actions, observations, rewards
+and dones are transferred between the main process and the workers using
+shared memory arrays, with the processes synchronized by sending short
+command and done messages over pipes, so no data is pickled on each step
+(unless info dicts are requested). Pipes are used rather than a barrier so
+the main process can detect when a worker has died.
+"""
+import multiprocessing as mp
+
+import numpy as np
+
+from .environment import NASimEnv
+
+# commands sent from main process to workers
+_STEP = 0
+_RESET = 1
+_CLOSE = 2
+
+
+def _worker(env_idx,
+            scenario,
+            env_kwargs,
+            num_envs,
+            n_substeps,
+            obs_size,
+            shared,
+            conn):
+    """Worker process loop, runs commands on a single environment """
+    env = NASimEnv(scenario, **env_kwargs)
+    actions = np.frombuffer(shared["actions"], dtype=np.int32).reshape(
+        num_envs, n_substeps
+    )[env_idx]
+    obs = np.frombuffer(shared["obs"], dtype=np.float32).reshape(
+        num_envs, n_substeps, obs_size
+    )[env_idx]
+    rewards = np.frombuffer(shared["rewards"], dtype=np.float32).reshape(
+        num_envs, n_substeps
+    )[env_idx]
+    dones = np.frombuffer(shared["dones"], dtype=np.bool_).reshape(
+        num_envs, n_substeps
+    )[env_idx]
+
+    try:
+        while True:
+            cmd, with_info = conn.recv_bytes()
+            if cmd == _CLOSE:
+                break
+            if cmd == _RESET:
+                obs[0] = env.reset().ravel()
+            else:
+                infos = []
+                for t in range(n_substeps):
+                    o, r, d, info = env.step(int(actions[t]))
+                    if d:
+                        if with_info:
+                            info = dict(info, terminal_observation=o)
+                        o = env.reset()
+                    obs[t] = o.ravel()
+                    rewards[t] = r
+                    dones[t] = d
+                    if with_info:
+                        infos.append(info)
+                if with_info:
+                    conn.send(infos)
+                    continue
+            # signal command is done
+            conn.send_bytes(b"")
+    except EOFError:
+        # main process has exited
+        pass
+    finally:
+        conn.close()
+
+
+class SubprocNASimEnv:
+    """Runs multiple NASimEnv environments in parallel, with each environment
+    in its own worker process.
+
+    All environments use the same scenario and a flat action space, so each
+    action is represented by an integer.
+
+    Environments are reset automatically when an episode ends, in which case
+    the observation returned for that environment is the first observation of
+    the next episode. If info dicts are requested, the last observation of
+    the finished episode is stored in the info dict under the
+    "terminal_observation" key.
+
+    Each call to :func:`step` can perform *n_substeps* steps in each
+    environment, to amortize the cost of synchronizing with the workers.
+
+    ...
+
+    Attributes
+    ----------
+    name : str
+        the environment scenario name
+    scenario : Scenario
+        Scenario object, defining the properties of the environments
+    num_envs : int
+        the number of environments
+    n_substeps : int
+        the number of steps performed in each environment per call to step
+    action_space : FlatActionSpace
+        Action space for a single environment
+    observation_space : gym.spaces.Box
+        observation space for a single environment
+    """
+
+    def __init__(self,
+                 scenario,
+                 num_envs,
+                 fully_obs=False,
+                 flat_obs=True,
+                 n_substeps=1,
+                 start_method=None,
+                 timeout=60):
+        """
+        Parameters
+        ----------
+        scenario : Scenario
+            Scenario object, defining the properties of the environments
+        num_envs : int
+            the number of environments (and worker processes)
+        fully_obs : bool, optional
+            The observability mode of environments, if True then uses fully
+            observable mode, otherwise is partially observable (default=False)
+        flat_obs : bool, optional
+            If true then uses a 1D observation space, otherwise uses a 2D
+            observation space (default=True)
+        n_substeps : int, optional
+            number of steps performed in each environment per call to step
+            (default=1)
+        start_method : str, optional
+            multiprocessing start method to use for workers, if None uses
+            the platform default (default=None)
+        timeout : float, optional
+            maximum number of seconds to wait for a worker to complete a
+            command before raising a RuntimeError (workers that have died
+            are detected without waiting). If None waits forever
+            (default=60)
+        """
+        assert n_substeps >= 1
+        self.name = scenario.name
+        self.scenario = scenario
+        self.num_envs = num_envs
+        self.n_substeps = n_substeps
+        self.timeout = timeout
+
+        env_kwargs = {"fully_obs": fully_obs,
+                      "flat_actions": True,
+                      "flat_obs": flat_obs}
+        env = NASimEnv(scenario, **env_kwargs)
+        self.action_space = env.action_space
+        self.observation_space = env.observation_space
+        obs_shape = self.observation_space.shape
+        obs_size = int(np.prod(obs_shape))
+
+        ctx = mp.get_context(start_method)
+        shared = {
+            "actions": ctx.RawArray("i", num_envs * n_substeps),
+            "obs": ctx.RawArray("f", num_envs * n_substeps * obs_size),
+            "rewards": ctx.RawArray("f", num_envs * n_substeps),
+            "dones": ctx.RawArray("b", num_envs * n_substeps)
+        }
+        self._actions = np.frombuffer(
+            shared["actions"], dtype=np.int32
+        ).reshape(num_envs, n_substeps)
+        self._obs = np.frombuffer(shared["obs"], dtype=np.float32).reshape(
+            (num_envs, n_substeps) + obs_shape
+        )
+        self._rewards = np.frombuffer(
+            shared["rewards"], dtype=np.float32
+        ).reshape(num_envs, n_substeps)
+        self._dones = np.frombuffer(shared["dones"], dtype=np.bool_).reshape(
+            num_envs, n_substeps
+        )
+
+        self._conns = []
+        self._processes = []
+        for env_idx in range(num_envs):
+            parent_conn, child_conn = ctx.Pipe()
+            args = (env_idx,
+                    scenario,
+                    env_kwargs,
+                    num_envs,
+                    n_substeps,
+                    obs_size,
+                    shared,
+                    child_conn)
+            process = ctx.Process(target=_worker, args=args, daemon=True)
+            process.start()
+            child_conn.close()
+            self._conns.append(parent_conn)
+            self._processes.append(process)
+        self.closed = False
+
+    def reset(self):
+        """Reset every environment.
+
+        Returns
+        -------
+        numpy.Array
+            the initial observation of each environment, stacked along the
+            first axis
+        """
+        self._run_command(_RESET)
+        return self._obs[:, 0].copy()
+
+    def step(self, actions, with_info=False):
+        """Run n_substeps steps in every environment.
+
+        Parameters
+        ----------
+        actions : list or numpy.Array
+            the integer actions to perform. Shape is (num_envs, ) if
+            n_substeps is 1, otherwise (num_envs, n_substeps).
+        with_info : bool, optional
+            whether to return info dicts from each environment, which must
+            be sent from the workers (default=False)
+
+        Returns
+        -------
+        numpy.Array
+            observations from each environment
+        numpy.Array
+            rewards from each environment
+        numpy.Array
+            whether episode ended for each environment
+        list of dict or None
+            info dict for each environment (list of lists, one for each
+            substep, if n_substeps > 1) if with_info is True, otherwise None
+
+        Notes
+        -----
+        If n_substeps > 1 then observations, rewards and dones have an
+        additional second axis with one entry for each substep.
+        """
+        self._actions[:] = np.reshape(
+            actions, (self.num_envs, self.n_substeps)
+        )
+        infos = self._run_command(_STEP, with_info)
+        if self.n_substeps == 1:
+            obs = self._obs[:, 0].copy()
+            rewards = self._rewards[:, 0].copy()
+            dones = self._dones[:, 0].copy()
+            if infos is not None:
+                infos = [info[0] for info in infos]
+            return obs, rewards, dones, infos
+        return (self._obs.copy(),
+                self._rewards.copy(),
+                self._dones.copy(),
+                infos)
+
+    def close(self):
+        """Stop all worker processes """
+        if self.closed:
+            return
+        for conn in self._conns:
+            try:
+                conn.send_bytes(bytes((_CLOSE, 0)))
+            except OSError:
+                # worker has already exited
+                pass
+        for process in self._processes:
+            process.join(self.timeout)
+            if process.is_alive():
+                process.terminate()
+                process.join()
+        for conn in self._conns:
+            conn.close()
+        self.closed = True
+
+    def _run_command(self, cmd, with_info=False):
+        """Run command on all workers, returning the info dicts sent by each
+        worker if with_info is True, otherwise None
+        """
+        assert not self.closed, "Cannot use SubprocNASimEnv after close"
+        try:
+            for conn in self._conns:
+                conn.send_bytes(bytes((cmd, with_info)))
+            # each worker replies with its infos, or an empty done message,
+            # once it has finished the command
+            infos = [] if with_info else None
+            for conn in self._conns:
+                if not conn.poll(self.timeout):
+                    raise TimeoutError
+                if with_info:
+                    infos.append(conn.recv())
+                else:
+                    conn.recv_bytes()
+        except (OSError, EOFError, TimeoutError):
+            # workers may be mid command, so can't be used again
+            self.close()
+            raise RuntimeError("SubprocNASimEnv worker process failed")
+        return infos
+
+    def __del__(self):
+        if not getattr(self, "closed", True):
+            self.close()
+
+    def __str__(self):
+        output = [
+            "SubprocNASimEnv:",
+            f"name={self.name}",
+            f"num_envs={self.num_envs}",
+            f"n_substeps={self.n_substeps}"
+        ]
+        return "\n  ".join(output)
@@ -0,0 +1,240 @@
+""" A vectorized version of NASimEnv: VecNASimEnv.
+
+The VecNASimEnv class steps a batch of environments for the same scenario
+together. The state of every environment is stored in a single stacked
+tensor so the connection, firewall, random failure and goal checks for the
+whole batch are performed using numpy operations, with only actions that
+pass these checks executed individually.
+"""
+import numpy as np
+from gym import spaces
+
+from .state import State
+from .network import Network
+from .host_vector import HostVector
+from .observation import Observation
+from .action import FAILED_RESULT, CONNECTION_ERROR_RESULT, FlatActionSpace
+
+
+class VecNASimEnv:
+    """A batch of simulated computer network environments for pen-testing.
+
+    All environments in the batch use the same scenario and a flat action
+    space, so each action is represented by an integer.
+
+    Environments are reset automatically when they reach the goal or the
+    scenario step limit. In this case the observation returned for that
+    environment is the first observation of the next episode, while the last
+    observation of the finished episode is stored in the environments info
+    dict under the "terminal_observation" key.
+
+    ...
+
+    Attributes
+    ----------
+    name : str
+        the environment scenario name
+    scenario : Scenario
+        Scenario object, defining the properties of the environments
+    num_envs : int
+        the number of environments in the batch
+    action_space : FlatActionSpace
+        Action space for a single environment
+    observation_space : gym.spaces.Box
+        observation space for a single environment.
+        If *flat_obs=True* then observations are represented by a 1D vector,
+        otherwise observations are represented as a 2D matrix.
+    states : list of State
+        the current state of each environment. Each state is a view into
+        the stacked state tensor of the batch.
+    steps : numpy.ndarray
+        the number of steps performed since last reset in each environment
+    """
+
+    def __init__(self,
+                 scenario,
+                 num_envs,
+                 fully_obs=False,
+                 flat_obs=True):
+        """
+        Parameters
+        ----------
+        scenario : Scenario
+            Scenario object, defining the properties of the environments
+        num_envs : int
+            the number of environments in the batch
+        fully_obs : bool, optional
+            The observability mode of environments, if True then uses fully
+            observable mode, otherwise is partially observable (default=False)
+        flat_obs : bool, optional
+            If true then uses a 1D observation space, otherwise uses a 2D
+            observation space (default=True)
+        """
+        self.name = scenario.name
+        self.scenario = scenario
+        self.num_envs = num_envs
+        self.fully_obs = fully_obs
+        self.flat_obs = flat_obs
+
+        self.network = Network(scenario)
+        self.action_space = FlatActionSpace(scenario)
+
+        initial_state = State.generate_initial_state(self.network)
+        self._initial_tensor = initial_state.tensor
+        self._initial_obs = initial_state.get_initial_observation(
+            self.fully_obs
+        ).numpy()
+        self._obs_shape = self._initial_obs.shape
+
+        self._tensors = np.repeat(
+            self._initial_tensor[np.newaxis], num_envs, axis=0
+        )
+        self.states = [
+            State(self._tensors[i], self.network.host_num_map)
+            for i in range(num_envs)
+        ]
+        self.steps = np.zeros(num_envs, dtype=np.int64)
+
+        if self.flat_obs:
+            obs_shape = (self._initial_obs.size, )
+        else:
+            obs_shape = self._obs_shape
+        obs_low, obs_high = Observation.get_space_bounds(self.scenario)
+        self.observation_space = spaces.Box(
+            low=obs_low, high=obs_high, shape=obs_shape
+        )
+
+    def reset(self):
+        """Reset the state of every environment in batch.
+
+        Returns
+        -------
+        numpy.Array
+            the initial observation of each environment, stacked along the
+            first axis
+        """
+        self._tensors[:] = self._initial_tensor
+        self.steps[:] = 0
+        obs = np.repeat(self._initial_obs[np.newaxis], self.num_envs, axis=0)
+        return self._format_obs(obs)
+
+    def step_batch(self, actions):
+        """Run one step of every environment in batch.
+
+        Parameters
+        ----------
+        actions : list or numpy.Array
+            the integer action to perform in each environment
+
+        Returns
+        -------
+        numpy.Array
+            observation of each environment, stacked along first axis
+        numpy.Array
+            reward from performing action in each environment
+        numpy.Array
+            whether the episode has ended for each environment
+        list of dict
+            auxiliary information regarding step for each environment
+            (see :func:`nasim.env.action.ActionResult.info`)
+        """
+        actions = np.asarray(actions, dtype=np.intp)
+        assert actions.shape == (self.num_envs, ), \
+            f"Must provide one action per env: {actions.shape} is invalid"
+
+        a_space = self.action_space
+        env_idxs = np.arange(self.num_envs)
+        targets = self._tensors[env_idxs, a_space.target_idx[actions]]
+        is_exploit = a_space.is_exploit[actions]
+        compromised = targets[:, HostVector._compromised_idx] == 1
+
+        connection_error = ~(
+            (targets[:, HostVector._reachable_idx] == 1)
+            & (targets[:, HostVector._discovered_idx] == 1)
+        )
+        connection_error |= is_exploit & ~self._traffic_permitted(actions)
+        # exploits against already compromised hosts don't fail randomly
+        random_failure = (
+            (np.random.rand(self.num_envs) > a_space.prob[actions])
+            & ~(is_exploit & compromised)
+        )
+        failed = connection_error | random_failure
+
+        obs = np.zeros((self.num_envs, ) + self._obs_shape, dtype=np.float32)
+        rewards = -a_space.cost[actions]
+        infos = [None] * self.num_envs
+        for i in np.flatnonzero(~failed):
+            action = a_space.actions[actions[i]]
+            state, action_obs = self.network._execute_action(
+                self.states[i], action
+            )
+            obs[i] = state.get_observation(
+                action, action_obs, self.fully_obs
+            ).numpy()
+            rewards[i] += action_obs.value
+            infos[i] = action_obs.info()
+
+        for i in np.flatnonzero(failed):
+            if connection_error[i]:
+                infos[i] = CONNECTION_ERROR_RESULT.info()
+            else:
+                infos[i] = FAILED_RESULT.info()
+        if self.fully_obs:
+            obs[failed, :-1] = self._tensors[failed]
+        obs[failed, -1, Observation._conn_error_idx] = \
+            connection_error[failed]
+
+        self.steps += 1
+        dones = self._goal_reached()
+        if self.scenario.step_limit is not None:
+            dones |= self.steps >= self.scenario.step_limit
+
+        obs = self._format_obs(obs)
+        if dones.any():
+            for i in np.flatnonzero(dones):
+                infos[i]["terminal_observation"] = obs[i].copy()
+            self._tensors[dones] = self._initial_tensor
+            self.steps[dones] = 0
+            obs[dones] = self._format_obs(self._initial_obs[np.newaxis])
+        return obs, rewards, dones, infos
+
+    def _traffic_permitted(self, actions):
+        """Check firewall permits traffic for the target subnet and service
+        of each action (for exploits) in each environment.
+        """
+        comp_envs, comp_hosts = np.nonzero(
+            self._tensors[:, :, HostVector._compromised_idx] == 1
+        )
+        sources = np.repeat(
+            self.network._subnet_public[np.newaxis], self.num_envs, axis=0
+        )
+        sources[comp_envs, self.network._host_subnet[comp_hosts]] = True
+        # service is -1 for non-exploits, these are ignored by caller
+        permitted = self.network._firewall[
+            :,
+            self.action_space.target_subnet[actions],
+            self.action_space.service[actions]
+        ]
+        return (permitted.T & sources).any(axis=1)
+
+    def _goal_reached(self):
+        """Check if each environment is in a goal state """
+        sensitive = self._tensors[
+            :, self.network._sensitive_idx, HostVector._compromised_idx
+        ]
+        return (sensitive == 1).all(axis=1)
+
+    def _format_obs(self, obs):
+        if self.flat_obs:
+            return obs.reshape(obs.shape[0], -1)
+        return obs
+
+    def __str__(self):
+        output = [
+            "VecNASimEnv:",
+            f"name={self.name}",
+            f"num_envs={self.num_envs}",
+            f"fully_obs={self.fully_obs}",
+            f"flat_obs={self.flat_obs}"
+        ]
+        return "\n  ".join(output)
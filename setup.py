@@ -1,10 +1,65 @@
+import warnings
+import importlib.util
+
 from setuptools import setup, find_packages
+from setuptools.command import build_ext
+from distutils.errors import CCompilerError, DistutilsError
+
+
+def get_ext_modules():
+    """Get extension for ahead-of-time compiled environment kernels.
+
+    This is only built if numba is installed (and supports ahead-of-time
+    compilation), otherwise the kernels are JIT compiled or run uncompiled.
+    """
+    try:
+        import numba.pycc    # noqa
+        spec = importlib.util.spec_from_file_location(
+            "nasim.envs._aot_build", "nasim/envs/_aot_build.py"
+        )
+        aot_build = importlib.util.module_from_spec(spec)
+        spec.loader.exec_module(aot_build)
+        return [aot_build.cc.distutils_extension()]
+    except ImportError:
+        return []
+    except Exception as e:
+        warnings.warn(f"Not building compiled kernels: {e}")
+        return []
+
+
+ext_modules = get_ext_modules()
+
+
+# defined after getting ext_modules, since numba replaces build_ext with a
+# subclass that compiles its extensions
+class OptionalBuildExt(build_ext.build_ext):
+    """Builds extensions, warning instead of failing if an extension can't
+    be built, since the compiled kernels are only an optional speed-up.
+    """
+
+    def run(self):
+        try:
+            super().run()
+        except (CCompilerError, DistutilsError) as e:
+            warnings.warn(f"Failed to build compiled kernels: {e}")
+
+    def build_extension(self, ext):
+        try:
+            super().build_extension(ext)
+        except Exception as e:
+            # numba compilation can fail with errors other than the
+            # distutils compiler errors
+            warnings.warn(f"Failed to build {ext.name}: {e}")
+
 
 extras = {
     'dqn': [
         'torch>=1.5',
         'tensorboard>=2.2'
     ],
+    'numba': [
+        'numba>=0.50'
+    ],
     'docs': [
         'sphinx>=3.0',
         'sphinx-rtd-theme>=0.4'
@@ -39,6 +94,8 @@ setup(
         'prettytable>=0.7'
     ],
     extras_require=extras,
+    ext_modules=ext_modules,
+    cmdclass={'build_ext': OptionalBuildExt},
     python_requires='>=3.7',
     package_data={
         'nasim': ['nasim/scenarios/benchmark/*.yaml']
@@ -0,0 +1,32 @@
+"""Tests for the shared results of failed actions """
+
+import pickle
+
+import pytest
+
+from nasim.envs.action import FAILED_RESULT, CONNECTION_ERROR_RESULT
+
+
+@pytest.mark.parametrize("result", [FAILED_RESULT, CONNECTION_ERROR_RESULT])
+def test_failed_result_info_not_shared(result):
+    info = result.info()
+    info["services"]["ssh"] = 1.0
+    info["os"]["linux"] = 1.0
+    info["discovered"][(1, 0)] = True
+    new_info = result.info()
+    assert new_info["services"] == {}
+    assert new_info["os"] == {}
+    assert new_info["discovered"] == {}
+
+
+@pytest.mark.parametrize("result", [FAILED_RESULT, CONNECTION_ERROR_RESULT])
+def test_failed_result_read_only(result):
+    with pytest.raises(TypeError):
+        result.services["ssh"] = 1.0
+
+
+@pytest.mark.parametrize("result", [FAILED_RESULT, CONNECTION_ERROR_RESULT])
+def test_failed_result_pickle(result):
+    loaded = pickle.loads(pickle.dumps(result))
+    assert loaded.info() == result.info()
+    assert pickle.loads(pickle.dumps(result.info())) == result.info()
@@ -0,0 +1,49 @@
+"""Runs GPU environment, checking it matches the behaviour of the vectorized
+CPU environment.
+
+These tests are skipped if numba or a CUDA GPU is not available (set
+NUMBA_ENABLE_CUDASIM=1 to run them using numba's CUDA simulator).
+"""
+
+import numpy as np
+import pytest
+
+from nasim.envs import VecNASimEnv
+from nasim.scenarios import generate_scenario
+
+cuda = pytest.importorskip("numba.cuda")
+pytestmark = pytest.mark.skipif(not cuda.is_available(),
+                                reason="CUDA is not available")
+
+
+@pytest.mark.parametrize("flat_obs", [True, False])
+def test_cuda_matches_vec(flat_obs):
+    """Tests GPU batch steps match CPU batch steps, using a scenario with
+    deterministic exploits
+    """
+    from nasim.envs.cuda_env import CudaNASimEnv
+
+    num_envs = 4
+    scenario = generate_scenario(
+        20, 4, seed=2, exploit_probs=1.0, step_limit=50
+    )
+    cuda_env = CudaNASimEnv(scenario, num_envs, flat_obs=flat_obs)
+    vec_env = VecNASimEnv(scenario,
+                          num_envs,
+                          fully_obs=True,
+                          flat_obs=flat_obs)
+
+    obs = cuda_env.reset().copy_to_host()
+    assert np.array_equal(obs, vec_env.reset())
+
+    rng = np.random.RandomState(0)
+    for t in range(120):
+        actions = rng.randint(vec_env.action_space.n, size=num_envs)
+        obs, rewards, dones, info = cuda_env.step_batch(actions)
+        v_obs, v_rewards, v_dones, v_infos = vec_env.step_batch(actions)
+        assert np.array_equal(dones.copy_to_host(), v_dones)
+        assert np.allclose(rewards.copy_to_host(), v_rewards)
+        assert np.array_equal(obs.copy_to_host(), v_obs)
+        success = info["success"].copy_to_host()
+        for i in range(num_envs):
+            assert success[i] == v_infos[i]["success"]
@@ -0,0 +1,48 @@
+"""Tests for NASimEnv action handling """
+
+import numpy as np
+import pytest
+
+import nasim
+
+
+@pytest.mark.parametrize("int_type", [int, np.int32, np.int64])
+def test_step_integer_action_types(int_type):
+    env = nasim.make_benchmark("tiny", seed=0, flat_actions=True)
+    expected_env = nasim.make_benchmark("tiny", seed=0, flat_actions=True)
+    env.reset()
+    expected_env.reset()
+    for a in range(env.action_space.n):
+        np.random.seed(a)
+        o, r, d, _ = env.step(int_type(a))
+        np.random.seed(a)
+        expected_o, expected_r, expected_d, _ = expected_env.step(a)
+        assert np.array_equal(o, expected_o)
+        assert r == expected_r
+        assert d == expected_d
+
+
+@pytest.mark.parametrize("int_type", [int, np.int32, np.int64])
+def test_render_action(int_type, capsys):
+    env = nasim.make_benchmark("tiny", seed=0, flat_actions=True)
+    env.render_action(int_type(0))
+    assert capsys.readouterr().out == f"{env.action_space.get_action(0)}\n"
+
+
+def test_action_mask():
+    env = nasim.make_benchmark(
+        "small", seed=0, flat_actions=True, fully_obs=True
+    )
+    env.reset()
+    rng = np.random.RandomState(0)
+    actions = env.action_space.actions
+    for _ in range(200):
+        state = env.current_state
+        expected = [state.host_discovered(a.target) for a in actions]
+        mask = env.get_action_mask()
+        assert mask.shape == (env.action_space.n, )
+        assert np.array_equal(mask, np.asarray(expected, dtype=np.int64))
+        # only choose valid actions, so more hosts are discovered
+        _, _, done, _ = env.step(int(rng.choice(np.flatnonzero(mask))))
+        if done:
+            env.reset()
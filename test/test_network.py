@@ -0,0 +1,53 @@
+"""Tests for pickling environments and the generated network goal check """
+
+import copy
+import pickle
+
+import numpy as np
+import pytest
+
+import nasim
+from nasim.envs.network import _make_goal_check
+
+
+@pytest.mark.parametrize("copy_fn", [
+    lambda env: pickle.loads(pickle.dumps(env)),
+    copy.deepcopy
+])
+def test_copy_env(copy_fn):
+    env = nasim.make_benchmark("tiny", seed=0, flat_actions=True)
+    env.reset()
+    env_copy = copy_fn(env)
+    assert env_copy.network._goal_check is not None
+    for a in range(env.action_space.n):
+        np.random.seed(a)
+        o, r, d, _ = env.step(a)
+        np.random.seed(a)
+        copy_o, copy_r, copy_d, _ = env_copy.step(a)
+        assert np.array_equal(o, copy_o)
+        assert r == copy_r
+        assert d == copy_d
+        goal = env.network.all_sensitive_hosts_compromised(env.current_state)
+        copy_goal = env_copy.network.all_sensitive_hosts_compromised(
+            env_copy.current_state
+        )
+        assert goal == copy_goal
+        if d:
+            break
+
+
+def test_goal_check():
+    tensor = np.zeros((4, 3), dtype=np.float32)
+    goal_check = _make_goal_check([1, 3])
+    assert goal_check(tensor, 2) is False
+    tensor[1, 2] = 1
+    assert goal_check(tensor, 2) is False
+    tensor[3, 2] = 1
+    assert goal_check(tensor, 2) is True
+    # checks compromised column index passed in
+    assert goal_check(tensor, 0) is False
+
+
+def test_goal_check_no_sensitive_hosts():
+    goal_check = _make_goal_check([])
+    assert goal_check(np.zeros((4, 3), dtype=np.float32), 2) is True
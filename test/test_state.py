@@ -0,0 +1,49 @@
+"""Tests converting states and observations to numpy arrays """
+
+import numpy as np
+import pytest
+
+import nasim
+
+
+@pytest.fixture
+def env():
+    env = nasim.make_benchmark("tiny", seed=0, flat_actions=True)
+    env.reset()
+    return env
+
+
+def test_state_asarray_no_copy(env):
+    state = env.current_state
+    assert np.asarray(state) is state.tensor
+    assert np.asarray(state, dtype=np.float32) is state.tensor
+    assert np.asarray(state, dtype=np.float64).dtype == np.float64
+
+
+def test_state_array_copy(env):
+    state = env.current_state
+    arr = state.__array__(copy=True)
+    assert arr is not state.tensor
+    assert np.array_equal(arr, state.tensor)
+    with pytest.raises(ValueError):
+        state.__array__(np.float64, copy=False)
+
+
+def test_stack_states(env):
+    states = [env.current_state]
+    for a in range(3):
+        env.step(a)
+        states.append(env.current_state)
+    stacked = np.stack(states)
+    assert stacked.shape == (len(states), ) + env.current_state.shape()
+    for i, state in enumerate(states):
+        assert np.array_equal(stacked[i], state.tensor)
+
+
+def test_observation_asarray_no_copy(env):
+    obs = env.current_state.get_initial_observation(False)
+    assert np.asarray(obs) is obs.tensor
+    with pytest.raises(ValueError):
+        obs.__array__(np.float64, copy=False)
+    stacked = np.stack([obs, obs])
+    assert np.array_equal(stacked[1], obs.tensor)
@@ -0,0 +1,91 @@
+"""Runs environments in worker processes, checking it matches the behaviour
+of running NASimEnv environments in the main process.
+"""
+
+import numpy as np
+import pytest
+
+from nasim.envs import NASimEnv, SubprocNASimEnv
+from nasim.scenarios import generate_scenario
+
+
+@pytest.mark.parametrize("flat_obs", [True, False])
+@pytest.mark.parametrize("n_substeps", [1, 3])
+def test_subproc_matches_single(flat_obs, n_substeps):
+    """Tests worker steps match stepping individual envs, using a scenario
+    with deterministic exploits
+    """
+    num_envs = 2
+    scenario = generate_scenario(
+        20, 4, seed=2, exploit_probs=1.0, step_limit=100
+    )
+    subproc_env = SubprocNASimEnv(scenario,
+                                  num_envs,
+                                  flat_obs=flat_obs,
+                                  n_substeps=n_substeps)
+    envs = [NASimEnv(scenario, flat_obs=flat_obs) for _ in range(num_envs)]
+
+    try:
+        obs = subproc_env.reset()
+        for i, env in enumerate(envs):
+            assert np.array_equal(obs[i], env.reset())
+
+        rng = np.random.RandomState(0)
+        for t in range(100):
+            actions = rng.randint(subproc_env.action_space.n,
+                                  size=(num_envs, n_substeps))
+            with_info = t % 2 == 0
+            obs, rewards, dones, infos = subproc_env.step(actions, with_info)
+            if n_substeps == 1:
+                obs, rewards, dones = obs[:, None], rewards[:, None], \
+                    dones[:, None]
+                if with_info:
+                    infos = [[info] for info in infos]
+            assert (infos is not None) == with_info
+            for i, env in enumerate(envs):
+                for s in range(n_substeps):
+                    o, r, d, info = env.step(int(actions[i, s]))
+                    assert d == dones[i, s]
+                    assert np.isclose(r, rewards[i, s])
+                    if d:
+                        if with_info:
+                            terminal_obs = infos[i][s]["terminal_observation"]
+                            assert np.array_equal(o, terminal_obs)
+                        o = env.reset()
+                    assert np.array_equal(o, obs[i, s])
+    finally:
+        subproc_env.close()
+
+
+def test_subproc_large_infos():
+    """Tests stepping with infos doesn't deadlock when infos are larger than
+    the pipe buffer (here due to large terminal observations)
+    """
+    scenario = generate_scenario(300, 20, seed=0, step_limit=1)
+    subproc_env = SubprocNASimEnv(scenario, 2, n_substeps=3, timeout=30)
+    try:
+        subproc_env.reset()
+        actions = np.zeros((2, 3), dtype=np.int64)
+        obs, _, dones, infos = subproc_env.step(actions, with_info=True)
+        assert dones.all()
+        for env_infos in infos:
+            for info in env_infos:
+                assert info["terminal_observation"].shape == obs.shape[2:]
+    finally:
+        subproc_env.close()
+
+
+def test_subproc_dead_worker():
+    """Tests stepping raises an error, rather than hanging, if a worker
+    process has died
+    """
+    scenario = generate_scenario(20, 4, seed=2, step_limit=100)
+    subproc_env = SubprocNASimEnv(scenario, 2, timeout=2)
+    try:
+        subproc_env.reset()
+        subproc_env._processes[0].kill()
+        subproc_env._processes[0].join()
+        with pytest.raises(RuntimeError):
+            subproc_env.step([0, 0])
+    finally:
+        subproc_env.close()
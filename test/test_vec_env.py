@@ -0,0 +1,75 @@
+"""Runs vectorized environment for different scenarios and parameters,
+checking it matches the behaviour of running NASimEnv environments one at a
+time.
+"""
+
+import numpy as np
+import pytest
+
+from nasim.envs import NASimEnv, VecNASimEnv
+from nasim.scenarios.benchmark import AVAIL_BENCHMARKS
+from nasim.scenarios import make_benchmark_scenario, generate_scenario
+
+
+@pytest.mark.parametrize("scenario", AVAIL_BENCHMARKS)
+@pytest.mark.parametrize("fully_obs", [True, False])
+@pytest.mark.parametrize("flat_obs", [True, False])
+def test_vec_bruteforce(scenario, fully_obs, flat_obs):
+    """Tests every env in batch completes an episode when cycling through
+    all actions, checking for any errors
+    """
+    num_envs = 3
+    env = VecNASimEnv(make_benchmark_scenario(scenario, 0),
+                      num_envs,
+                      fully_obs=fully_obs,
+                      flat_obs=flat_obs)
+    obs = env.reset()
+    assert obs.shape == (num_envs, ) + env.observation_space.shape
+
+    # offset each env so they perform different actions
+    actions = np.arange(num_envs)
+    episode_done = np.zeros(num_envs, dtype=bool)
+    while not episode_done.all():
+        obs, rewards, dones, infos = env.step_batch(actions)
+        assert obs.shape == (num_envs, ) + env.observation_space.shape
+        for i in np.flatnonzero(dones):
+            assert "terminal_observation" in infos[i]
+            assert env.steps[i] == 0
+        episode_done |= dones
+        actions = (actions + 1) % env.action_space.n
+
+
+@pytest.mark.parametrize("fully_obs", [True, False])
+@pytest.mark.parametrize("flat_obs", [True, False])
+def test_vec_matches_single(fully_obs, flat_obs):
+    """Tests batch steps match stepping individual envs, using a scenario
+    with deterministic exploits
+    """
+    num_envs = 4
+    scenario = generate_scenario(
+        20, 4, seed=2, exploit_probs=1.0, step_limit=300
+    )
+    vec_env = VecNASimEnv(scenario,
+                          num_envs,
+                          fully_obs=fully_obs,
+                          flat_obs=flat_obs)
+    envs = [NASimEnv(scenario, fully_obs=fully_obs, flat_obs=flat_obs)
+            for _ in range(num_envs)]
+
+    obs = vec_env.reset()
+    for i, env in enumerate(envs):
+        assert np.array_equal(obs[i], env.reset())
+
+    rng = np.random.RandomState(0)
+    for t in range(1000):
+        actions = rng.randint(vec_env.action_space.n, size=num_envs)
+        obs, rewards, dones, infos = vec_env.step_batch(actions)
+        for i, env in enumerate(envs):
+            o, r, d, info = env.step(int(actions[i]))
+            assert d == dones[i]
+            assert np.isclose(r, rewards[i])
+            assert info["success"] == infos[i]["success"]
+            if d:
+                assert np.array_equal(o, infos[i]["terminal_observation"])
+                o = env.reset()
+            assert np.array_equal(o, obs[i])